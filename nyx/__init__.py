@@ -723,6 +723,8 @@ class Interface(object):
       for panel in self.page_panels():
         panel.redraw()
 
+      nyx.curses.flush()
+
   def redraw(self, force = False):
     """
     Renders our displayed content.
@@ -730,9 +732,12 @@ class Interface(object):
 
     occupied = 0
 
-    for panel in self.page_panels():
-      panel.redraw(force = force, top = occupied)
-      occupied += panel.get_height()
+    with nyx.curses.frame():
+      for panel in self.page_panels():
+        panel.redraw(force = force, top = occupied)
+        occupied += panel.get_height()
+
+    nyx.curses.flush()
 
   def quit(self):
     """
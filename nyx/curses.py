@@ -17,6 +17,7 @@ if we want Windows support in the future too.
   curses_attr - curses encoded text attribute
   clear - wipes all content from the screen
   screen_size - provides the dimensions of our screen
+  frame - caches our screen dimensions while rendering several subwindows
   screenshot - dump of the present on-screen content
   asci_to_curses - converts terminal formatting to curses
   demo_glyphs - renders a chart showing the ACS options
@@ -29,6 +30,7 @@ if we want Windows support in the future too.
   is_wide_characters_supported - checks if curses supports wide character
 
   draw - renders subwindow that can be drawn into
+  flush - renders deferred drawing to the screen
 
   Subwindow - subwindow that can be drawn within
     |- addstr - draws a string
@@ -85,6 +87,7 @@ if we want Windows support in the future too.
 from __future__ import absolute_import
 
 import collections
+import contextlib
 import curses
 import curses.ascii
 import curses.textpad
@@ -100,13 +103,44 @@ import stem.util.log
 import stem.util.str_tools
 import stem.util.system
 
+try:
+  # added in python 3.2
+  from functools import lru_cache
+except ImportError:
+  from stem.util.lru_cache import lru_cache
+
+try:
+  # Cython reentrant lock that's notably cheaper to acquire when uncontended,
+  # which is the norm since every redraw takes our CURSES_LOCK
+
+  from fastrlock.rlock import FastRLock as RLock
+except ImportError:
+  from threading import RLock
+
 # Curses screen we've initialized and lock for interacting with it. Curses
 # isn't thread safe and concurrency bugs produce especially sinister glitches.
 
 CURSES_SCREEN = None
-CURSES_LOCK = threading.RLock()
+CURSES_LOCK = RLock()
 HALT_ACTIVITY = False
 
+# Subwindows we've drawn within, keyed by their geometry. These are reused
+# until the screen is resized rather than made anew for every draw.
+
+SUBWINDOWS = {}
+SUBWINDOWS_SCREEN_SIZE = None
+
+# Drawing calls we last rendered for each subwindow, and the subwindow that
+# last drew each screen row. Rows that are unchanged since we last drew them
+# are left alone rather than being erased and drawn again.
+
+LAST_DRAWN = {}
+ROW_WRITERS = []
+
+# Screen dimensions while we're rendering a frame, tracked per thread.
+
+FRAME = threading.local()
+
 # Text colors and attributes. These are *very* commonly used so including
 # shorter aliases (so they can be referenced as just GREEN or BOLD).
 
@@ -150,6 +184,12 @@ ASCI_TO_CURSES = {
 DEFAULT_COLOR_ATTR = dict([(color, 0) for color in Color])
 COLOR_ATTR = None
 
+# Encodings of attribute combinations, keyed by the (attributes, color
+# override) they were made with. Nearly every draw call encodes one of a
+# handful of combinations so we only work each of them out once.
+
+ENCODED_ATTR = {}
+
 SCROLL_KEYS = (curses.KEY_UP, curses.KEY_DOWN, curses.KEY_PPAGE, curses.KEY_NPAGE, curses.KEY_HOME, curses.KEY_END)
 
 SPECIAL_KEYS = {
@@ -186,7 +226,7 @@ CONFIG = stem.util.conf.config_dict('nyx', {
 }, conf_handler)
 
 
-def start(function, acs_support = True, transparent_background = False, cursor = True):
+def start(function, acs_support = True, transparent_background = False, cursor = True, hardware_scrolling = False):
   """
   Starts a curses interface, delegating to the given function.
 
@@ -194,12 +234,16 @@ def start(function, acs_support = True, transparent_background = False, cursor =
   :param bool acs_support: uses wide characters for pipes
   :param bool transparent_background: allows background transparency
   :param bool cursor: makes cursor visible
+  :param bool hardware_scrolling: lets curses shift scrolled content with the
+    terminal's insert/delete line capabilities rather than redrawing it
   """
 
   def _wrapper(stdscr):
-    global CURSES_SCREEN
+    global CURSES_SCREEN, SUBWINDOWS_SCREEN_SIZE
 
     CURSES_SCREEN = stdscr
+    SUBWINDOWS_SCREEN_SIZE = None
+    _reset_drawn()
 
     if not acs_support:
       _disable_acs()
@@ -216,6 +260,13 @@ def start(function, acs_support = True, transparent_background = False, cursor =
       except curses.error:
         pass
 
+    if hardware_scrolling:
+      # When content scrolls, curses detects the shifted lines as it updates
+      # the screen. This lets it move them with a single terminal sequence
+      # rather than rewriting each line.
+
+      stdscr.idlok(True)
+
     function()
 
   curses.wrapper(_wrapper)
@@ -238,6 +289,7 @@ def key_input(input_timeout = None):
   else:
     curses.cbreak()  # wait indefinitely for key presses (no timeout)
 
+  flush()  # presents deferred updates, such as prompts, before we block
   return KeyInput(CURSES_SCREEN.getch())
 
 
@@ -276,6 +328,9 @@ def str_input(x, y, initial_text = '', backlog = None, tab_completion = None):
     curses_subwindow.erase()
     curses_subwindow.addstr(0, 0, initial_text[:width - 1])
 
+    if y < len(ROW_WRITERS):
+      ROW_WRITERS[y] = None  # we're drawing over this row
+
     textbox = curses.textpad.Textbox(curses_subwindow, insert_mode = True)
     handler = _handle_key
 
@@ -434,17 +489,26 @@ def curses_attr(*attributes):
   :returns: **int** that can be used with curses
   """
 
+  override = get_color_override()
+  encoded = ENCODED_ATTR.get((attributes, override))
+
+  if encoded is not None:
+    return encoded
+
   encoded = curses.A_NORMAL
 
+  # Checking membership against our mappings rather than the enums, which
+  # iterate over their values for each check.
+
   for attr in attributes:
-    if attr in Color:
-      override = get_color_override()
+    if attr in CURSES_COLORS:
       encoded |= _color_attr()[override if override else attr]
-    elif attr in Attr:
+    elif attr in CURSES_ATTRIBUTES:
       encoded |= CURSES_ATTRIBUTES[attr]
     else:
       raise ValueError("'%s' isn't a valid curses text attribute" % attr)
 
+  ENCODED_ATTR[(attributes, override)] = encoded
   return encoded
 
 
@@ -454,6 +518,7 @@ def clear():
   """
 
   CURSES_SCREEN.clear()
+  _reset_drawn()
 
 
 def screen_size():
@@ -463,10 +528,35 @@ def screen_size():
   :returns: :data:`~nyx.curses.Dimensions` with our screen size
   """
 
+  frame_size = getattr(FRAME, 'screen_size', None)
+
+  if frame_size is not None:
+    return frame_size
+
   height, width = CURSES_SCREEN.getmaxyx()
   return Dimensions(width, height)
 
 
+@contextlib.contextmanager
+def frame():
+  """
+  Context for rendering several subwindows together. Our screen's dimensions
+  are fetched once, and provided by :func:`~nyx.curses.screen_size` until the
+  frame is done.
+  """
+
+  if getattr(FRAME, 'screen_size', None) is not None:
+    yield  # already within a frame
+    return
+
+  FRAME.screen_size = screen_size()
+
+  try:
+    yield
+  finally:
+    FRAME.screen_size = None
+
+
 def screenshot():
   """
   Provides a dump of the present content of the screen.
@@ -491,39 +581,52 @@ def asci_to_curses(msg):
   :returns: **list** series of (text, attr) tuples that's renderable by curses
   """
 
-  entries, next_attr = [], ()
-  match = ANSI_RE.search(msg)
+  entries, next_attr, last_end = [], (), 0
 
-  while match:
-    if match.start() > 0:
-      entries.append((msg[:match.start()], next_attr))
+  for match in ANSI_RE.finditer(msg):
+    if match.start() > last_end:
+      entries.append((msg[last_end:match.start()], next_attr))
 
-    curses_attr = match.group(1).split(';')
-    new_attr = [ASCI_TO_CURSES[num] for num in curses_attr if num in ASCI_TO_CURSES]
+    next_attr = _next_asci_attr(next_attr, match.group(1))
+    last_end = match.end()
 
-    if '0' in curses_attr:
-      next_attr = tuple(new_attr)  # includes a 'reset'
-    else:
-      combined_attr = list(next_attr)
+  if last_end < len(msg):
+    entries.append((msg[last_end:], next_attr))
 
-      for attr in new_attr:
-        if attr in combined_attr:
-          continue
-        elif attr in Color:
-          # replace previous color with new one
-          combined_attr = list(filter(lambda attr: attr not in Color, combined_attr))
+  return entries
 
-        combined_attr.append(attr)
 
-      next_attr = tuple(combined_attr)
+@lru_cache()
+def _next_asci_attr(current_attr, codes):
+  """
+  Applies an ANSI escape sequence to the attributes we're presently rendering
+  with. Only a handful of these transitions occur so they're cached rather
+  than parsed each time we come across them.
 
-    msg = msg[match.end():]
-    match = ANSI_RE.search(msg)
+  :param tuple current_attr: attributes we're presently rendering with
+  :param str codes: semicolon separated codes of the escape sequence
 
-  if msg:
-    entries.append((msg, next_attr))
+  :returns: **tuple** with the attributes to render with afterward
+  """
 
-  return entries
+  codes = codes.split(';')
+  new_attr = [ASCI_TO_CURSES[num] for num in codes if num in ASCI_TO_CURSES]
+
+  if '0' in codes:
+    return tuple(new_attr)  # includes a 'reset'
+
+  combined_attr = list(current_attr)
+
+  for attr in new_attr:
+    if attr in combined_attr:
+      continue
+    elif attr in CURSES_COLORS:
+      # replace previous color with new one
+      combined_attr = list(filter(lambda attr: attr not in CURSES_COLORS, combined_attr))
+
+    combined_attr.append(attr)
+
+  return tuple(combined_attr)
 
 
 def demo_glyphs():
@@ -709,7 +812,7 @@ def is_wide_characters_supported():
   return False
 
 
-def draw(func, left = 0, top = 0, width = None, height = None, background = None, draw_if_resized = None):
+def draw(func, left = 0, top = 0, width = None, height = None, background = None, draw_if_resized = None, flush = True):
   """
   Renders a subwindow. This calls the given draw function with a
   :class:`~nyx.curses._Subwindow`.
@@ -722,10 +825,23 @@ def draw(func, left = 0, top = 0, width = None, height = None, background = None
   :param nyx.curses.Color background: background color, unset if **None**
   :param nyx.curses.Dimension draw_if_resized: only draw content if
     dimentions have changed from this
+  :param bool flush: renders to the screen right away if **True**, otherwise
+    this is deferred until :func:`~nyx.curses.flush` is called
 
   :returns: :class:`~nyx.curses.Dimension` for the space we drew within
   """
 
+  # Checking if there's anything to draw only reads our screen's dimensions,
+  # so we can skip waiting on the lock if there isn't.
+
+  if HALT_ACTIVITY:
+    return
+
+  dimensions, subwindow_dimensions = _subwindow_dimensions(left, top, width, height)
+
+  if subwindow_dimensions == draw_if_resized:
+    return subwindow_dimensions  # draw size hasn't changed
+
   start = time.time()
 
   while not CURSES_LOCK.acquire(False):
@@ -738,29 +854,22 @@ def draw(func, left = 0, top = 0, width = None, height = None, background = None
     if HALT_ACTIVITY:
       return
 
-    dimensions = screen_size()
-    subwindow_width = max(0, dimensions.width - left)
-    subwindow_height = max(0, dimensions.height - top)
-
-    if width:
-      subwindow_width = min(width, subwindow_width)
-
-    if height:
-      subwindow_height = min(height, subwindow_height)
-
-    subwindow_dimensions = Dimensions(subwindow_width, subwindow_height)
+    dimensions, subwindow_dimensions = _subwindow_dimensions(left, top, width, height)
 
     if subwindow_dimensions == draw_if_resized:
       return subwindow_dimensions  # draw size hasn't changed
 
-    curses_subwindow = CURSES_SCREEN.subwin(subwindow_height, subwindow_width, top, left)
-    curses_subwindow.erase()
+    subwindow_width, subwindow_height = subwindow_dimensions
+    key, curses_subwindow = _subwindow(dimensions, subwindow_width, subwindow_height, top, left, background)
+    subwindow = _Subwindow(subwindow_width, subwindow_height, curses_subwindow)
 
-    if background:
-      curses_subwindow.bkgd(' ', curses_attr(background, HIGHLIGHT))
+    func(subwindow)
+    _render(key, top, curses_subwindow, subwindow_height, subwindow._calls, subwindow._spans)
 
-    func(_Subwindow(subwindow_width, subwindow_height, curses_subwindow))
-    curses_subwindow.refresh()
+    if flush:
+      curses_subwindow.refresh()
+    else:
+      curses_subwindow.noutrefresh()
 
     return subwindow_dimensions
   except curses.error:
@@ -769,6 +878,188 @@ def draw(func, left = 0, top = 0, width = None, height = None, background = None
     CURSES_LOCK.release()
 
 
+def _subwindow_dimensions(left, top, width, height):
+  """
+  Provides the dimensions of a subwindow with the given bounds.
+
+  :param int left: left position of the subwindow
+  :param int top: top position of the subwindow
+  :param int width: subwindow width, uses all available space if **None**
+  :param int height: subwindow height, uses all available space if **None**
+
+  :returns: **tuple** of the form (screen dimensions, subwindow dimensions)
+  """
+
+  dimensions = screen_size()
+  subwindow_width = max(0, dimensions.width - left)
+  subwindow_height = max(0, dimensions.height - top)
+
+  if width:
+    subwindow_width = min(width, subwindow_width)
+
+  if height:
+    subwindow_height = min(height, subwindow_height)
+
+  return dimensions, Dimensions(subwindow_width, subwindow_height)
+
+
+def _subwindow(screen_size, width, height, top, left, background):
+  """
+  Provides a curses subwindow with the given geometry, reusing the one we made
+  earlier if the screen hasn't been resized since.
+
+  :param nyx.curses.Dimensions screen_size: present dimensions of the screen
+  :param int width: subwindow width
+  :param int height: subwindow height
+  :param int top: top position of the subwindow
+  :param int left: left position of the subwindow
+  :param nyx.curses.Color background: background color, unset if **None**
+
+  :returns: **tuple** of the form (key, curses subwindow) for the given
+    geometry
+  """
+
+  global SUBWINDOWS_SCREEN_SIZE
+
+  if screen_size != SUBWINDOWS_SCREEN_SIZE:
+    SUBWINDOWS_SCREEN_SIZE = screen_size
+    _reset_drawn()
+
+  background_attr = curses_attr(background, HIGHLIGHT) if background else None
+  key = (width, height, top, left, background_attr)
+  curses_subwindow = SUBWINDOWS.get(key)
+
+  if curses_subwindow is None:
+    curses_subwindow = CURSES_SCREEN.subwin(height, width, top, left)
+
+    if background_attr is not None:
+      curses_subwindow.bkgd(' ', background_attr)
+
+    SUBWINDOWS[key] = curses_subwindow
+
+  return key, curses_subwindow
+
+
+def _render(key, top, curses_subwindow, height, calls, spans):
+  """
+  Renders the drawing calls of a subwindow. Rows are only erased and drawn if
+  their content has changed, or something else has drawn over them since.
+  Rows spanned by a vertical line are rendered together.
+
+  :param tuple key: subwindow being rendered
+  :param int top: top position of the subwindow
+  :param curses_subwindow: curses subwindow to render within
+  :param int height: subwindow height
+  :param list calls: drawing calls of the subwindow, in the order they were made
+  :param list spans: **tuples** of the (top, bottom) rows vertical lines span
+  """
+
+  last_drawn = LAST_DRAWN.get(key)
+  bottom = top + height
+
+  if len(ROW_WRITERS) < bottom:
+    ROW_WRITERS.extend([None] * (bottom - len(ROW_WRITERS)))
+
+  # Most redraws don't change anything, so compare the whole subwindow before
+  # checking it band by band. List comparisons are done in C so this is cheap.
+
+  if last_drawn is not None and last_drawn[0] == calls and ROW_WRITERS[top:bottom] == [key] * height:
+    return
+
+  row_bands = _bands(height, spans)
+  band_calls = dict((band, []) for band in row_bands)  # ordered top to bottom
+
+  for call in calls:
+    band_calls[row_bands[call[1]]].append(call)
+
+  last_band_calls = last_drawn[1] if last_drawn is not None else {}
+  move, clrtoeol = curses_subwindow.move, curses_subwindow.clrtoeol
+
+  draw_methods = {
+    'addstr': curses_subwindow.addstr,
+    'addch': curses_subwindow.addch,
+    'hline': curses_subwindow.hline,
+    'vline': curses_subwindow.vline,
+  }
+
+  for band, band_content in band_calls.items():
+    band_top, band_bottom = band
+    writers = [key] * (band_bottom - band_top)
+
+    if last_band_calls.get(band) == band_content and ROW_WRITERS[top + band_top:top + band_bottom] == writers:
+      continue  # band is unchanged
+
+    for y in range(band_top, band_bottom):
+      try:
+        move(y, 0)
+        clrtoeol()
+      except curses.error:
+        pass
+
+    for call in band_content:
+      try:
+        draw_methods[call[0]](*call[1:])
+      except curses.error:
+        pass
+
+    ROW_WRITERS[top + band_top:top + band_bottom] = writers
+
+  LAST_DRAWN[key] = (calls, band_calls)
+
+
+def _bands(height, spans):
+  """
+  Groups rows that are rendered together. Each row is its own band unless
+  vertical lines span it, in which case overlapping lines are merged into a
+  band that covers all their rows.
+
+  :param int height: number of rows
+  :param list spans: **tuples** of the (top, bottom) rows vertical lines span
+
+  :returns: **list** with the (top, bottom) band of each row
+  """
+
+  row_bands = [(y, y + 1) for y in range(height)]
+  merged = []
+
+  for span_top, span_bottom in sorted(spans):
+    if merged and span_top < merged[-1][1]:
+      merged[-1][1] = max(merged[-1][1], span_bottom)
+    else:
+      merged.append([span_top, span_bottom])
+
+  for band_top, band_bottom in merged:
+    row_bands[band_top:band_bottom] = [(band_top, band_bottom)] * (band_bottom - band_top)
+
+  return row_bands
+
+
+def _reset_drawn():
+  """
+  Forgets what we've drawn, so subwindows are fully redrawn.
+  """
+
+  SUBWINDOWS.clear()
+  LAST_DRAWN.clear()
+  del ROW_WRITERS[:]
+
+
+def flush():
+  """
+  Renders content drawn with deferred updates. Flushing these together emits a
+  single terminal update rather than one per subwindow.
+  """
+
+  with CURSES_LOCK:
+    if HALT_ACTIVITY:
+      return
+
+    try:
+      curses.doupdate()
+    except curses.error:
+      pass  # curses isn't initialized
+
+
 class _Subwindow(object):
   """
   Subwindow that can be drawn within.
@@ -777,10 +1068,35 @@ class _Subwindow(object):
   :var int height: subwindow height
   """
 
+  # Subwindows are made for every draw and their attributes are read by each
+  # drawing call, so we use slots for cheaper construction and lookups.
+
+  __slots__ = ('width', 'height', '_curses_subwindow', '_calls', '_spans', '_color_override')
+
   def __init__(self, width, height, curses_subwindow):
     self.width = width
     self.height = height
     self._curses_subwindow = curses_subwindow
+    self._calls = []  # drawing calls, rendered when we're done
+    self._spans = []  # rows spanned by vertical lines
+    self._color_override = get_color_override()  # constant while we draw
+
+  def _attr(self, attr):
+    """
+    Provides the encoding of the given attributes, checking our cache before
+    falling back to :func:`~nyx.curses.curses_attr`. This is **None** if they
+    can't be encoded, such as when curses is unable to initialize colors.
+    """
+
+    encoded = ENCODED_ATTR.get((attr, self._color_override))
+
+    if encoded is not None:
+      return encoded
+
+    try:
+      return curses_attr(*attr)
+    except curses.error:
+      return None
 
   def addstr(self, x, y, msg, *attr):
     """
@@ -794,13 +1110,17 @@ class _Subwindow(object):
     :returns: **int** with the horizontal position we drew to
     """
 
-    if self.width > x and self.height > y:
-      try:
-        cropped_msg = msg[:self.width - x]
-        self._curses_subwindow.addstr(y, x, cropped_msg, curses_attr(*attr))
-        return x + len(cropped_msg)
-      except:
-        pass
+    if 0 <= x < self.width and 0 <= y < self.height:
+      encoded = self._attr(attr)
+
+      if encoded is None:
+        return x
+
+      if len(msg) > self.width - x:
+        msg = msg[:self.width - x]  # most messages fit, so only crop if needed
+
+      self._calls.append(('addstr', y, x, msg, encoded))
+      return x + len(msg)
 
     return x
 
@@ -819,6 +1139,7 @@ class _Subwindow(object):
     """
 
     orig_y = y
+    max_line_wrap = CONFIG['max_line_wrap']
 
     while msg:
       draw_msg, msg = stem.util.str_tools.crop(msg, width - x, None, ending = None, get_remainder = True)
@@ -829,7 +1150,7 @@ class _Subwindow(object):
       x = self.addstr(x, y, draw_msg, *attr)
       msg = msg.lstrip()
 
-      if (y - orig_y + 1) >= CONFIG['max_line_wrap']:
+      if (y - orig_y + 1) >= max_line_wrap:
         break  # maximum number we'll wrap
 
       if msg:
@@ -909,11 +1230,13 @@ class _Subwindow(object):
 
     # draws scrollbar slider
 
+    addstr = self.addstr  # avoids an attribute lookup for each row
+
     for i in range(scrollbar_height):
       if i >= slider_top and i <= slider_top + slider_size:
-        self.addstr(0, i + top, fill_char, Attr.HIGHLIGHT)
+        addstr(0, i + top, fill_char, Attr.HIGHLIGHT)
       else:
-        self.addstr(0, i + top, ' ')
+        addstr(0, i + top, ' ')
 
     # draws box around the scrollbar
 
@@ -922,12 +1245,12 @@ class _Subwindow(object):
     self._addch(0, self.height - 1, curses.ACS_HLINE)
 
   def _addch(self, x, y, char, *attr):
-    if self.width > x and self.height > y:
-      try:
-        self._curses_subwindow.addch(y, x, char, curses_attr(*attr))
+    if 0 <= x < self.width and 0 <= y < self.height:
+      encoded = self._attr(attr)
+
+      if encoded is not None:
+        self._calls.append(('addch', y, x, char, encoded))
         return x + 1
-      except:
-        pass
 
     return x
 
@@ -935,21 +1258,23 @@ class _Subwindow(object):
     char = kwargs.get('char', curses.ACS_HLINE)
     char = ord(char) if isinstance(char, str) else char
 
-    if self.width > x and self.height > y and length > 0:
-      try:
-        self._curses_subwindow.hline(max(0, y), max(0, x), char | curses_attr(*attr), min(length, self.width - x))
-      except:
-        pass
+    encoded = self._attr(attr)
+
+    if self.width > x and self.height > y and length > 0 and encoded is not None:
+      self._calls.append(('hline', max(0, y), max(0, x), char | encoded, min(length, self.width - x)))
 
   def vline(self, x, y, length, *attr, **kwargs):
     char = kwargs.get('char', curses.ACS_VLINE)
     char = ord(char) if isinstance(char, str) else char
 
-    if self.width > x and self.height > y and length > 0:
-      try:
-        self._curses_subwindow.vline(max(0, y), max(0, x), char | curses_attr(*attr), min(length, self.height - y))
-      except:
-        pass
+    encoded = self._attr(attr)
+
+    if self.width > x and self.height > y and length > 0 and encoded is not None:
+      top = max(0, y)
+      bottom = min(top + min(length, self.height - y), self.height)
+
+      self._calls.append(('vline', top, max(0, x), char | encoded, bottom - top))
+      self._spans.append((top, bottom))
 
 
 class KeyInput(object):
@@ -41,7 +41,6 @@ import re
 import threading
 import time
 
-import memory_profiler.profile
 import stem.util.conf
 import stem.util.log
 import stem.util.system
@@ -54,6 +53,16 @@ try:
 except ImportError:
     from stem.util.lru_cache import lru_cache
 
+# Line by line memory profiling traces every call made while we run, so only
+# do so when asked.
+
+if os.environ.get("NYX_MPROF"):
+    from memory_profiler import profile
+else:
+
+    def profile(func):
+        return func
+
 TOR_RUNLEVELS = ["DEBUG", "INFO", "NOTICE", "WARN", "ERR"]
 NYX_RUNLEVELS = [
     "NYX_DEBUG",
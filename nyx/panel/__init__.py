@@ -21,6 +21,7 @@ Panels consisting the nyx interface.
     |
     |- set_visible - toggles panel visiblity
     |- set_paused - notified when interface pauses or unpauses
+    |- invalidate - notes that the panel's content has changed
     |- key_handlers - keyboard input accepted by the panel
     |- submenu - submenu for the panel
     +- redraw - renders the panel content
@@ -31,6 +32,8 @@ import inspect
 import threading
 import time
 
+import stem.util.log
+
 import nyx
 import nyx.curses
 
@@ -44,6 +47,16 @@ __all__ = [
   'torrc',
 ]
 
+# Panels awaiting a redraw. Requests from our main thread are drawn right away
+# (and flushed to the screen with the rest of the interface), whereas others
+# are coalesced and rendered by a single flush thread so a burst of requests
+# only paints each panel once.
+
+_PENDING = set()
+_PENDING_LOCK = threading.RLock()
+_FLUSH_EVENT = threading.Event()
+_FLUSH_THREAD = None
+
 
 class KeyHandler(collections.namedtuple('Help', ['key', 'description', 'current'])):
   """
@@ -95,6 +108,10 @@ class Panel(object):
 
     self._last_draw_top = 0
     self._last_draw_size = nyx.curses.Dimensions(0, 0)
+    self._dirty = False  # force our next draw when flushed
+
+    self._content_version = 0  # incremented when our content changes
+    self._drawn_version = 0  # content version we last drew
 
   def get_top(self):
     """
@@ -132,6 +149,14 @@ class Panel(object):
 
     pass
 
+  def invalidate(self):
+    """
+    Notes that our content has changed, so our next redraw renders it even if
+    it isn't forced.
+    """
+
+    self._content_version += 1
+
   def key_handlers(self):
     """
     Provides keyboard input this panel supports.
@@ -156,7 +181,7 @@ class Panel(object):
     Renders our panel's content to the screen.
 
     :param bool force: if **False** only redraws content if the panel's
-      dimensions have changed
+      dimensions have changed or it has been invalidated
     :param int top: position to render relative to the top of the screen
     """
 
@@ -166,18 +191,103 @@ class Panel(object):
     if not self._visible:
       return  # not currently visible
 
-    if not force and self._last_draw_top == self._top:
+    with _PENDING_LOCK:
+      self._dirty |= force
+      _PENDING.add(self)
+
+    if threading.current_thread() is threading.main_thread():
+      _flush()
+    else:
+      _start_flush_thread()
+      _FLUSH_EVENT.set()
+
+  def _redraw(self, force):
+    """
+    Renders our panel's content, skipping this if we're no longer visible.
+
+    :param bool force: if **False** only redraws content if the panel's
+      dimensions have changed or it has been invalidated
+    """
+
+    if not self._visible:
+      return
+
+    content_version = self._content_version
+
+    if not force and self._last_draw_top == self._top and self._drawn_version == content_version:
       draw_dimension = self._last_draw_size
     else:
       draw_dimension = None  # force redraw
 
     self._last_draw_top = self._top
-    self._last_draw_size = nyx.curses.draw(self._draw, top = self._top, height = self.get_height(), draw_if_resized = draw_dimension)
+    self._last_draw_size = nyx.curses.draw(self._draw, top = self._top, height = self.get_height(), draw_if_resized = draw_dimension, flush = False)
+
+    if self._last_draw_size is not None:
+      self._drawn_version = content_version
 
   def _draw(self, subwindow):
     pass
 
 
+def _flush():
+  """
+  Renders all panels with a pending redraw, from the top of the page down. If
+  any fail to draw they're retried with our next flush, and the first failure
+  is raised after the other panels are drawn.
+  """
+
+  with _PENDING_LOCK:
+    pending = [(panel, panel._dirty) for panel in sorted(_PENDING, key = lambda panel: panel._top)]
+    _PENDING.clear()
+
+    for panel, _ in pending:
+      panel._dirty = False
+
+  failure = None
+
+  with nyx.curses.frame():
+    for panel, force in pending:
+      try:
+        panel._redraw(force)
+      except Exception as exc:
+        with _PENDING_LOCK:
+          panel._dirty |= force
+          _PENDING.add(panel)
+
+        if failure is None:
+          failure = exc
+
+  if failure is not None:
+    raise failure
+
+
+def _start_flush_thread():
+  """
+  Starts the daemon thread that renders redraws requested by other threads.
+  """
+
+  global _FLUSH_THREAD
+
+  with _PENDING_LOCK:
+    if _FLUSH_THREAD is None:
+      _FLUSH_THREAD = threading.Thread(target = _flush_loop, name = 'nyx redraw')
+      _FLUSH_THREAD.setDaemon(True)
+      _FLUSH_THREAD.start()
+
+
+def _flush_loop():
+  while True:
+    _FLUSH_EVENT.wait()
+    _FLUSH_EVENT.clear()
+
+    try:
+      _flush()
+    except Exception as exc:
+      stem.util.log.warn('Unable to redraw panels: %s' % exc)
+
+    nyx.curses.flush()  # presents the panels we could draw
+
+
 class DaemonPanel(Panel, threading.Thread):
   """
   Panel that triggers its _update() method at a set rate.
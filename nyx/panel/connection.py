@@ -570,7 +570,8 @@ class ConnectionPanel(nyx.panel.DaemonPanel):
         except KeyError:
           pass
 
-    self.redraw()
+    self.invalidate()
+    self.redraw(force = False)
 
 
 def _draw_title(subwindow, entries, showing_details):
@@ -132,7 +132,7 @@ class GraphData(object):
       self.latest_value = clone.latest_value
       self.total = clone.total
       self.tick = clone.tick
-      self.values = copy.deepcopy(clone.values)
+      self.values = dict([(i, list(clone.values[i])) for i in clone.values])  # samplings are numbers, so copying each list suffices
 
       self._category = category
       self._is_primary = clone._is_primary
@@ -628,10 +628,17 @@ def _draw_subgraph(subwindow, data, x, width, height, bounds_type, interval, col
   for y, label in y_axis_labels.items():
     subwindow.addstr(x, y, label, color)
 
+  # values that are the same for every column
+
+  values = data.values[interval]
+  graph_left = x + x_axis_offset + 1
+  graph_height = height - 2
+  value_range = max(1, max_bound) - min_bound
+
   for col in range(columns):
-    column_count = int(data.values[interval][col]) - min_bound
-    column_height = int(min(height - 2, (height - 2) * column_count / (max(1, max_bound) - min_bound)))
-    subwindow.vline(x + col + x_axis_offset + 1, height - column_height, column_height, color, HIGHLIGHT, char = fill_char)
+    column_count = int(values[col]) - min_bound
+    column_height = int(min(graph_height, graph_height * column_count / value_range))
+    subwindow.vline(graph_left + col, height - column_height, column_height, color, HIGHLIGHT, char = fill_char)
 
 
 def _x_axis_labels(interval, columns):
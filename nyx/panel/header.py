@@ -211,7 +211,8 @@ class HeaderPanel(nyx.panel.DaemonPanel):
         self._reported_inactive = False
         log.notice('Relay resumed')
 
-    self.redraw()
+    self.invalidate()
+    self.redraw(force = False)
 
 
 class Sampling(object):
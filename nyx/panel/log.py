@@ -102,6 +102,7 @@ class LogPanel(nyx.panel.DaemonPanel):
     self._event_log = nyx.log.LogGroup(CONFIG['max_log_size'])
     self._event_log_paused = None
     self._event_types = nyx.log.listen_for_events(self._register_tor_event, logged_events)
+    self._event_types_set = frozenset(self._event_types)  # for checking events as they arrive
     self._log_file = nyx.log.LogFileOutput(CONFIG['write_logs_to'])
     self._filter = nyx.log.LogFilters(initial_filters = CONFIG['logging_filter'])
     self._show_duplicates = not CONFIG['deduplicate_log']
@@ -118,7 +119,7 @@ class LogPanel(nyx.panel.DaemonPanel):
       if log_location:
         try:
           for entry in reversed(list(nyx.log.read_tor_log(log_location, CONFIG['prepopulate_read_limit']))):
-            if entry.type in self._event_types:
+            if entry.type in self._event_types_set:
               self._event_log.add(entry)
         except IOError as exc:
           log.info('Unable to read log located at %s: %s' % (log_location, exc))
@@ -153,6 +154,7 @@ class LogPanel(nyx.panel.DaemonPanel):
 
     if event_types and event_types != self._event_types:
       self._event_types = nyx.log.listen_for_events(self._register_tor_event, event_types)
+      self._event_types_set = frozenset(self._event_types)
       self.redraw()
 
   def _show_snapshot_prompt(self):
@@ -340,9 +342,12 @@ class LogPanel(nyx.panel.DaemonPanel):
 
     current_day = nyx.log.day_count(time.time())
 
-    if self._has_new_event or self._last_day != current_day:
+    if self._last_day != current_day:
       self._last_day = current_day
-      self.redraw()
+      self.invalidate()  # yesterday's entries are now grouped under a divider
+
+    if self._has_new_event or self._drawn_version != self._content_version:
+      self.redraw(force = False)
 
   def _register_tor_event(self, event):
     msg = ' '.join(str(event).split(' ')[1:])
@@ -358,7 +363,7 @@ class LogPanel(nyx.panel.DaemonPanel):
     self._register_event(nyx.log.LogEntry(int(record.created), 'NYX_%s' % record.levelname, record.msg))
 
   def _register_event(self, event):
-    if event.type not in self._event_types:
+    if event.type not in self._event_types_set:
       return
 
     self._event_log.add(event)
@@ -368,6 +373,7 @@ class LogPanel(nyx.panel.DaemonPanel):
 
     if self._filter.match(event.display_message):
       self._has_new_event = True
+      self.invalidate()
 
 
 def _draw_title(subwindow, event_types, event_filter):
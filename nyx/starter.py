@@ -112,6 +112,7 @@ def main(config):
     stem.util.log.trace(TORRC.format(torrc_path = torrc_path, torrc_content = torrc_content))
 
   use_acs = config.get('acs_support', True)
+  use_hardware_scrolling = config.get('hardware_scrolling', False)
 
   _warn_if_root(controller)
   _warn_if_unable_to_get_pid(controller)
@@ -129,7 +130,7 @@ def main(config):
     os.putenv('ESCDELAY', '0')  # make 'esc' take effect right away
 
   try:
-    nyx.curses.start(nyx.draw_loop, acs_support = use_acs, transparent_background = True, cursor = False)
+    nyx.curses.start(nyx.draw_loop, acs_support = use_acs, transparent_background = True, cursor = False, hardware_scrolling = use_hardware_scrolling)
   except KeyboardInterrupt:
     pass  # skip printing a stack trace
   finally:
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
-import nyx.starter
 import sys
-from memory_profiler import profile
+
+import nyx.starter
+from nyx.log import profile
 
 
 @profile
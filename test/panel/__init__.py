@@ -3,6 +3,7 @@ Unit tests for nyx's panel modules.
 """
 
 __all__ = [
+  'base',
   'header',
   'graph',
   'interpreter',
@@ -0,0 +1,125 @@
+"""
+Unit tests for nyx.panel's Panel class.
+"""
+
+import threading
+import unittest
+
+import nyx.curses
+import nyx.panel
+
+try:
+  # added in python 3.3
+  from unittest.mock import call, Mock, patch
+except ImportError:
+  from mock import call, Mock, patch
+
+
+def _in_thread(func, *args, **kwargs):
+  thread = threading.Thread(target = func, args = args, kwargs = kwargs)
+  thread.start()
+  thread.join()
+
+
+class TestPanel(unittest.TestCase):
+  def setUp(self):
+    nyx.panel._PENDING.clear()
+    nyx.panel._FLUSH_EVENT.clear()
+
+  def tearDown(self):
+    nyx.panel._PENDING.clear()
+    nyx.panel._FLUSH_EVENT.clear()
+
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_redraw_from_main_thread(self, draw_mock):
+    panel = nyx.panel.Panel()
+    panel.set_visible(True)
+    panel.redraw()
+
+    self.assertEqual(1, draw_mock.call_count)
+
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_redraw_when_hidden(self, draw_mock):
+    panel = nyx.panel.Panel()
+    panel.redraw()
+
+    self.assertEqual(0, draw_mock.call_count)
+
+  @patch('nyx.panel._start_flush_thread', Mock())
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_redraw_coalesces_background_requests(self, draw_mock):
+    panel = nyx.panel.Panel()
+    panel.set_visible(True)
+
+    _in_thread(panel.redraw, force = False)
+    _in_thread(panel.redraw, force = True)
+    _in_thread(panel.redraw, force = False)
+
+    self.assertEqual(0, draw_mock.call_count)
+
+    nyx.panel._flush()
+    self.assertEqual(1, draw_mock.call_count)
+    self.assertEqual(None, draw_mock.call_args[1]['draw_if_resized'])  # forced
+
+    nyx.panel._flush()
+    self.assertEqual(1, draw_mock.call_count)
+
+  @patch('nyx.panel._start_flush_thread', Mock())
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_flush_in_page_order(self, draw_mock):
+    draw_mock.side_effect = [ValueError('unable to draw'), None, None]
+
+    top_panel, bottom_panel = nyx.panel.Panel(), nyx.panel.Panel()
+    top_panel.set_visible(True)
+    bottom_panel.set_visible(True)
+
+    _in_thread(bottom_panel.redraw, top = 5)
+    _in_thread(top_panel.redraw, top = 1)
+
+    self.assertRaises(ValueError, nyx.panel._flush)
+    self.assertEqual([1, 5], [args[1]['top'] for args in draw_mock.call_args_list])
+    self.assertEqual(set([top_panel]), nyx.panel._PENDING)  # retried with our next flush
+
+    nyx.panel._flush()
+    self.assertEqual(1, draw_mock.call_args[1]['top'])
+    self.assertEqual(None, draw_mock.call_args[1]['draw_if_resized'])  # still forced
+
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_redraw_when_invalidated(self, draw_mock):
+    draw_mock.return_value = nyx.curses.Dimensions(80, 25)
+
+    panel = nyx.panel.Panel()
+    panel.set_visible(True)
+    panel.redraw()
+
+    panel.redraw(force = False)
+    self.assertEqual(draw_mock.return_value, draw_mock.call_args[1]['draw_if_resized'])  # unchanged
+
+    panel.invalidate()
+    panel.redraw(force = False)
+    self.assertEqual(None, draw_mock.call_args[1]['draw_if_resized'])  # content changed
+
+    panel.redraw(force = False)
+    self.assertEqual(draw_mock.return_value, draw_mock.call_args[1]['draw_if_resized'])
+
+  @patch('curses.cbreak', Mock())
+  @patch('nyx.curses.draw')
+  @patch('nyx.curses.screen_size', Mock(return_value = nyx.curses.Dimensions(80, 25)))
+  def test_redraw_is_shown_before_key_input(self, draw_mock):
+    terminal = Mock()
+    terminal.screen.getch.return_value = ord('q')
+
+    panel = nyx.panel.Panel()
+    panel.set_visible(True)
+
+    with patch('curses.doupdate', terminal.doupdate), patch('nyx.curses.CURSES_SCREEN', terminal.screen):
+      panel.redraw()
+      nyx.curses.key_input()
+
+    self.assertEqual(1, draw_mock.call_count)
+    self.assertEqual([call.doupdate(), call.screen.getch()], terminal.mock_calls)
@@ -96,6 +96,19 @@ class TestGraphPanel(unittest.TestCase):
 
     self.assertEqual({2: '0', 11: '0'}, nyx.panel.graph._y_axis_labels(12, data.primary, 0, 0))
 
+  def test_graph_data_clone(self):
+    data = nyx.panel.graph.GraphData()
+
+    for i in range(10):
+      data.update(i)
+
+    clone = nyx.panel.graph.GraphData(data)
+    self.assertEqual(data.values, clone.values)
+
+    data.update(500)
+    self.assertNotEqual(data.values, clone.values)
+    self.assertEqual(45, clone.total)
+
   @require_curses
   @patch('nyx.panel.graph.tor_controller')
   def test_draw_subgraph_blank(self, tor_controller_mock):
@@ -16,9 +16,9 @@ from nyx.curses import Color, Attr
 
 try:
   # added in python 3.3
-  from unittest.mock import call, Mock
+  from unittest.mock import call, Mock, patch
 except ImportError:
-  from mock import call, Mock
+  from mock import call, Mock, patch
 
 EXPECTED_ADDSTR_WRAP = """
 0123456789 0123456789
@@ -98,6 +98,37 @@ class TestCurses(unittest.TestCase):
     self.assertEqual([('boo', ()), ('hi', (Color.RED,)), (' dami!', (Color.BLUE,))], nyx.curses.asci_to_curses('boo\x1b[31mhi\x1b[34m dami!\x1b[0m'))
     self.assertEqual([('boo', ()), ('hi!', (Color.RED, Attr.BOLD)), ('and bye!', ())], nyx.curses.asci_to_curses('boo\x1b[31;1mhi!\x1b[0mand bye!'))
 
+  def test_curses_lock(self):
+    try:
+      from fastrlock.rlock import FastRLock
+    except ImportError:
+      self.skipTest('(fastrlock unavailable)')
+
+    self.assertTrue(isinstance(nyx.curses.CURSES_LOCK, FastRLock))
+
+  def test_curses_attr(self):
+    self.assertEqual(curses.A_NORMAL, nyx.curses.curses_attr())
+    self.assertEqual(curses.A_BOLD, nyx.curses.curses_attr(Attr.BOLD))
+    self.assertEqual(curses.A_BOLD | curses.A_UNDERLINE, nyx.curses.curses_attr(Attr.BOLD, Attr.UNDERLINE))
+    self.assertEqual(curses.A_BOLD | curses.A_UNDERLINE, nyx.curses.curses_attr(Attr.BOLD, Attr.UNDERLINE))  # cached
+    self.assertRaises(ValueError, nyx.curses.curses_attr, 'blarg')
+
+  def test_screen_size_within_frame(self):
+    screen = Mock()
+    screen.getmaxyx.side_effect = [(25, 80), (30, 100), (40, 120)]
+
+    with patch('nyx.curses.CURSES_SCREEN', screen):
+      with nyx.curses.frame():
+        self.assertEqual(nyx.curses.Dimensions(80, 25), nyx.curses.screen_size())
+        self.assertEqual(nyx.curses.Dimensions(80, 25), nyx.curses.screen_size())
+
+        with nyx.curses.frame():
+          self.assertEqual(nyx.curses.Dimensions(80, 25), nyx.curses.screen_size())
+
+        self.assertEqual(nyx.curses.Dimensions(80, 25), nyx.curses.screen_size())
+
+      self.assertEqual(nyx.curses.Dimensions(100, 30), nyx.curses.screen_size())
+
   @require_curses
   def test_addstr(self):
     def _draw(subwindow):
@@ -151,6 +182,53 @@ class TestCurses(unittest.TestCase):
 
     self.assertEqual(EXPECTED_SCROLLBAR_BOTTOM, test.render(_draw).content.strip())
 
+  @require_curses
+  def test_draw_with_changed_rows(self):
+    def _draw_before(subwindow):
+      subwindow.addstr(0, 0, 'unchanged')
+      subwindow.addstr(0, 1, 'before redraw')
+
+    def _draw_after(subwindow):
+      subwindow.addstr(0, 0, 'unchanged')
+      subwindow.addstr(0, 1, 'after')
+
+    def _draw_over(subwindow):
+      subwindow.addstr(0, 0, 'popup')
+
+    def _draw():
+      nyx.curses.draw(_draw_before, height = 2)
+      nyx.curses.draw(_draw_after, height = 2)
+      nyx.curses.draw(_draw_over, width = 5, height = 1)
+      nyx.curses.draw(_draw_after, height = 2)
+
+    self.assertEqual('unchanged\nafter', test.render(_draw).content)
+
+  @require_curses
+  def test_draw_with_changed_rows_in_box(self):
+    def _draw_before(subwindow):
+      subwindow.box(0, 0, 5, 3)
+      subwindow.addstr(1, 1, 'abc')
+
+    def _draw_after(subwindow):
+      subwindow.addstr(1, 1, 'xyz')
+      subwindow.box(0, 0, 5, 3)
+
+    def _draw():
+      nyx.curses.draw(_draw_before, height = 3)
+      nyx.curses.draw(_draw_after, height = 3)
+
+    self.assertEqual(EXPECTED_BOX.replace('   ', 'xyz'), test.render(_draw).content)
+
+  @require_curses
+  @patch('nyx.curses._color_attr', Mock(side_effect = curses.error))
+  @patch.dict('nyx.curses.ENCODED_ATTR', clear = True)
+  def test_draw_with_unencodable_attr(self):
+    def _draw(subwindow):
+      subwindow.addstr(0, 0, 'plain text')
+      subwindow.addstr(0, 1, 'colored text', Color.GREEN)
+
+    self.assertEqual('plain text', test.render(_draw).content)
+
   def test_handle_key_with_text(self):
     self.assertEqual(ord('a'), nyx.curses._handle_key(_textbox(), ord('a')))
 